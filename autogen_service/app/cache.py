@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import hashlib
+import logging
+import os
+import pickle
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, TypeVar
+
+import diskcache
+import orjson
+
+# Off unless configured: cached agent outputs are derived from applicants' CVs.
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "0"))
+
+# Give up on a locked SQLite store quickly; a miss is cheaper than waiting.
+CACHE_LOCK_TIMEOUT_SECONDS = 1.0
+
+T = TypeVar("T")
+logger = logging.getLogger(__name__)
+
+
+# The cache is an optimization only: if the store cannot be opened, read or
+# written, lookups count as misses and writes are skipped.
+@lru_cache(maxsize=1)
+def _cache() -> diskcache.Cache | None:
+    directory = os.getenv("CACHE_DIR", "/tmp/autophd-cache")
+    try:
+        # Private to the service user; an existing directory keeps its own mode.
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        return diskcache.Cache(directory, timeout=CACHE_LOCK_TIMEOUT_SECONDS)
+    except Exception:
+        logger.debug("cache unavailable; continuing without it", exc_info=True)
+        return None
+
+
+def _get_blocking(key: str) -> Any | None:
+    store = _cache()
+    if store is None:
+        return None
+    try:
+        raw = store.get(key)
+        return None if raw is None else orjson.loads(raw)
+    except Exception:
+        logger.debug("cache read failed for %s", key, exc_info=True)
+        return None
+
+
+def _set_blocking(key: str, value: Any, ttl: int) -> None:
+    store = _cache()
+    if store is None:
+        return
+    try:
+        store.set(key, orjson.dumps(value), expire=ttl)
+    except Exception:
+        logger.debug("cache write failed for %s", key, exc_info=True)
+
+
+# SQLite calls run in a worker thread so lock waits never stall the event loop.
+async def get_value(key: str) -> Any | None:
+    if CACHE_TTL_SECONDS <= 0:
+        return None
+    return await asyncio.to_thread(_get_blocking, key)
+
+
+async def set_value(key: str, value: Any, ttl: int = CACHE_TTL_SECONDS) -> None:
+    if ttl > 0:
+        await asyncio.to_thread(_set_blocking, key, value, ttl)
+
+
+def _key_part(value: Any) -> Any:
+    # Large binary arguments such as uploaded images are keyed by digest rather
+    # than pickled into the key source.
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(value).digest()
+    return value
+
+
+def _is_result(value: Any) -> bool:
+    return value is not None
+
+
+def cached(
+    ttl: int = CACHE_TTL_SECONDS, keep: Callable[[Any], bool] = _is_result
+) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    # Caches an async tool's JSON result on disk, keyed by a hash of its arguments.
+    # Results rejected by `keep` (None by default) and raised errors are not stored,
+    # so failed lookups are retried on the next call.
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        prefix = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> T:
+            if ttl <= 0:
+                return await func(*args, **kwargs)
+
+            key_source = pickle.dumps(
+                (
+                    prefix,
+                    [_key_part(arg) for arg in args],
+                    sorted((name, _key_part(value)) for name, value in kwargs.items()),
+                )
+            )
+            key = hashlib.sha256(key_source).hexdigest()
+            hit = await get_value(key)
+            if hit is not None:
+                return hit
+
+            result = await func(*args, **kwargs)
+            if keep(result):
+                await set_value(key, result, ttl)
+            return result
+
+        return wrapper
+
+    return decorator
@@ -1,98 +1,256 @@
 from __future__ import annotations
 
-import json
-from typing import AsyncGenerator
+import asyncio
+import hashlib
+import os
+from contextlib import asynccontextmanager
+from tempfile import SpooledTemporaryFile
+from typing import IO, Any, AsyncGenerator
 
-from fastapi import FastAPI, File, Form, UploadFile
-from fastapi.responses import JSONResponse, StreamingResponse
-from pydantic import ValidationError
+import orjson
+from fastapi import Depends, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.responses import Response, StreamingResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
-from .pipeline import run_pipeline_stream
 from .schemas import GenerationRequest, UserInput
 
-app = FastAPI(title="PhDApply AutoGen Service", version="0.1.0")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
+    # The pipeline pulls in AutoGen and the model SDKs; load them once per worker
+    # here rather than at import time.
+    from .model_client import close_model_clients, create_model_client, get_model_settings
+    from .pipeline import run_pipeline_stream
+    from .tools.academic_api import close_academic_client
+    from .tools.web_context import close_web_client
+    from .utils.workers import shutdown_cpu_executor
 
-def _sse_event(event: str, data: dict) -> str:
-    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+    app.state.run_pipeline_stream = run_pipeline_stream
+    try:
+        # Build the shared model client up front; the pipeline picks up the same
+        # instance from create_model_client's registry.
+        create_model_client(get_model_settings())
+    except RuntimeError:
+        # Missing credentials are reported per request by the pipeline.
+        pass
+    yield
+    await close_model_clients()
+    await close_academic_client()
+    await close_web_client()
+    shutdown_cpu_executor()
+
+
+app = FastAPI(title="PhDApply AutoGen Service", version="0.1.0", lifespan=lifespan)
+
+UPLOAD_CHUNK_BYTES = 64 * 1024
+UPLOAD_SPOOL_MAX_BYTES = 1 << 20
+# PDF readers accept the %PDF header anywhere in the first kilobyte.
+PDF_SIGNATURE = b"%PDF"
+SIGNATURE_SCAN_BYTES = 1024
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+PIPELINE_QUEUE_SIZE = 64
+SSE_KEEPALIVE_SECONDS = 15.0
+_SSE_KEEPALIVE = b":keepalive\n\n"
+_SSE_HEADERS: dict[str, str] = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+_HEALTH_RESPONSE = Response(content=b'{"status":"ok"}', media_type="application/json")
+
+_EVENT_PREFIX: dict[str, bytes] = {}
+
+
+def _sse_event(event: str, data: dict) -> bytes:
+    prefix = _EVENT_PREFIX.get(event)
+    if prefix is None:
+        prefix = _EVENT_PREFIX[event] = f"event: {event}\ndata: ".encode()
+    return prefix + orjson.dumps(data) + b"\n\n"
+
+
+def _error_response(
+    message: str, status_code: int, headers: dict[str, str] | None = None
+) -> Response:
+    return Response(
+        orjson.dumps({"error": message}),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+class _RequestTooLarge(Exception):
+    pass
+
+
+class RequestSizeLimitMiddleware:
+    # Caps the whole request body at the ASGI layer, before and while Starlette
+    # parses the multipart form: an oversized Content-Length is refused without
+    # reading the body, and a chunked body is cut off once it passes the limit.
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_bytes:
+            await _error_response("Request body is too large", 413)(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    exceeded = True
+                    raise _RequestTooLarge
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal started
+            # Whatever the app makes of the aborted body (usually a 400 from form
+            # parsing) is replaced by the 413 below.
+            if exceeded and not started:
+                return
+            started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except _RequestTooLarge:
+            pass
+        if exceeded and not started:
+            await _error_response("Request body is too large", 413)(scope, receive, send)
+
+
+app.add_middleware(RequestSizeLimitMiddleware, max_bytes=MAX_UPLOAD_BYTES)
+
+
+async def _spool_upload(
+    upload: UploadFile,
+    hasher: Any | None = None,
+    signature: bytes | None = None,
+) -> SpooledTemporaryFile:
+    # Size is enforced on the whole request by RequestSizeLimitMiddleware. By the
+    # time this runs Starlette has already received the whole part; checking the
+    # signature on the first chunk only avoids copying a non-PDF into our spool.
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAX_BYTES)
+    first = True
+    while chunk := await upload.read(UPLOAD_CHUNK_BYTES):
+        if first and signature and signature not in chunk[:SIGNATURE_SCAN_BYTES]:
+            spool.close()
+            raise HTTPException(status_code=415, detail="CV file must be a PDF")
+        first = False
+        spool.write(chunk)
+        if hasher is not None:
+            hasher.update(chunk)
+    return spool
+
+
+async def _drain_pipeline(
+    request: GenerationRequest,
+    queue: asyncio.Queue[tuple[str, dict[str, Any]] | None],
+) -> None:
+    try:
+        async for event, payload in app.state.run_pipeline_stream(request):
+            await queue.put((event, payload))
+    except Exception as exc:
+        await queue.put(("error", {"error": str(exc)}))
+    await queue.put(None)
 
 
 @app.get("/health")
-async def health() -> dict[str, str]:
-    return {"status": "ok"}
+async def health() -> Response:
+    return _HEALTH_RESPONSE
+
+
+@app.exception_handler(HTTPException)
+async def http_error(_: Request, exc: HTTPException) -> Response:
+    return _error_response(exc.detail, exc.status_code, exc.headers)
 
 
 @app.post("/generate")
 async def generate(
-    professorName: str = Form(...),
-    university: str = Form(...),
-    language: str = Form("english"),
-    customLanguage: str = Form(""),
-    fundingStatus: str = Form("fully_funded"),
-    researchInterests: str = Form(""),
-    preferredStart: str = Form("Fall 2026"),
-    additionalNotes: str = Form(""),
-    postingContent: str = Form(""),
+    http_request: Request,
+    user_input: UserInput = Depends(UserInput.as_form),
     cvFile: UploadFile = File(...),
     contextImage: UploadFile | None = File(None),
 ):
-    if not professorName.strip() or not university.strip():
-        return JSONResponse(
-            {"error": "Professor name and university are required"}, status_code=400
-        )
+    if not user_input.professorName or not user_input.university:
+        return _error_response("Professor name and university are required", 400)
     if not cvFile:
-        return JSONResponse({"error": "CV file is required"}, status_code=400)
+        return _error_response("CV file is required", 400)
 
-    cv_bytes = await cvFile.read()
-    if not cv_bytes:
-        return JSONResponse({"error": "CV file is empty"}, status_code=400)
+    cv_hasher = hashlib.blake2b()
+    cv_file = await _spool_upload(cvFile, cv_hasher, signature=PDF_SIGNATURE)
+    if cv_file.tell() == 0:
+        cv_file.close()
+        return _error_response("CV file is empty", 400)
+    cv_file.seek(0)
 
-    image_bytes: bytes | None = None
+    image_file: IO[bytes] | None = None
     image_type: str | None = None
     image_filename: str | None = None
-    if contextImage:
-        image_bytes = await contextImage.read()
+    if contextImage and contextImage.size:
+        # Copy into our own spool: older FastAPI releases close form files as soon
+        # as the endpoint returns, before the streamed pipeline reads the image.
+        try:
+            image_file = await _spool_upload(contextImage)
+        except HTTPException:
+            cv_file.close()
+            raise
+        image_file.seek(0)
         image_type = contextImage.content_type
         image_filename = contextImage.filename
 
-    try:
-        user_input = UserInput(
-            professorName=professorName.strip(),
-            university=university.strip(),
-            language=language.strip().lower(),
-            customLanguage=customLanguage.strip() or None,
-            fundingStatus=fundingStatus.strip().lower(),
-            researchInterests=researchInterests.strip(),
-            preferredStart=preferredStart.strip() or "Fall 2026",
-            additionalNotes=additionalNotes.strip(),
-            postingContent=postingContent.strip(),
-        )
-    except ValidationError as exc:
-        return JSONResponse({"error": str(exc)}, status_code=400)
-
     request = GenerationRequest(
         input=user_input,
-        cv_pdf_bytes=cv_bytes,
+        cv_pdf_file=cv_file,
         cv_filename=cvFile.filename,
-        context_image_bytes=image_bytes,
+        cv_digest=cv_hasher.hexdigest(),
+        context_image_file=image_file,
         context_image_content_type=image_type,
         context_image_filename=image_filename,
     )
 
-    async def stream() -> AsyncGenerator[str, None]:
+    async def stream() -> AsyncGenerator[bytes, None]:
+        queue: asyncio.Queue[tuple[str, dict[str, Any]] | None] = asyncio.Queue(
+            maxsize=PIPELINE_QUEUE_SIZE
+        )
+        producer = asyncio.create_task(_drain_pipeline(request, queue))
+        # Bind hot-loop names locally; this loop runs once per token-level event.
+        sse = _sse_event
+        next_item = queue.get
+        wait_for = asyncio.wait_for
         try:
-            async for event, payload in run_pipeline_stream(request):
-                yield _sse_event(event, payload)
-        except Exception as exc:
-            yield _sse_event("error", {"error": str(exc)})
-
-    headers = {
-        "Cache-Control": "no-cache",
-        "Connection": "keep-alive",
-        "X-Accel-Buffering": "no",
-    }
-    return StreamingResponse(stream(), media_type="text/event-stream", headers=headers)
+            while True:
+                try:
+                    item = await wait_for(next_item(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await http_request.is_disconnected():
+                        break
+                    yield _SSE_KEEPALIVE
+                    continue
+                if item is None:
+                    break
+                yield sse(*item)
+        finally:
+            # Cancelling the producer aborts any in-flight model or web request so a
+            # client that went away stops consuming LLM quota and pool slots.
+            producer.cancel()
+            request.close()
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers=_SSE_HEADERS)
@@ -2,19 +2,32 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
+from functools import lru_cache
 
+import httpx
 from autogen_ext.models.openai import OpenAIChatCompletionClient
 
+MAX_CONNECTIONS = 100
+MAX_KEEPALIVE_CONNECTIONS = 50
+KEEPALIVE_EXPIRY_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 5.0
+WRITE_TIMEOUT_SECONDS = 10.0
+POOL_TIMEOUT_SECONDS = 2.0
 
-@dataclass
+
+@dataclass(frozen=True)
 class ModelSettings:
     api_key: str
     base_url: str
     model: str
     timeout_seconds: int = 90
-    max_retries: int = 2
+    max_retries: int = 8
+
 
+_clients: dict[ModelSettings, OpenAIChatCompletionClient] = {}
 
+
+@lru_cache(maxsize=1)
 def get_model_settings() -> ModelSettings:
     api_key = os.getenv("GEMINI_API_KEY", "").strip()
     if not api_key:
@@ -31,17 +44,38 @@ def get_model_settings() -> ModelSettings:
         base_url=base_url,
         model=model,
         timeout_seconds=int(os.getenv("WEB_TIMEOUT_SECONDS", "90")),
-        max_retries=2,
+        max_retries=int(os.getenv("AUTOGEN_MAX_RETRIES", "8")),
     )
 
 
 def create_model_client(settings: ModelSettings) -> OpenAIChatCompletionClient:
-    return OpenAIChatCompletionClient(
+    client = _clients.get(settings)
+    if client is not None:
+        return client
+
+    # Pool waits fail fast so the SDK's backoff retries them instead of hanging.
+    timeout = httpx.Timeout(
+        connect=CONNECT_TIMEOUT_SECONDS,
+        read=settings.timeout_seconds,
+        write=WRITE_TIMEOUT_SECONDS,
+        pool=POOL_TIMEOUT_SECONDS,
+    )
+    http_client = httpx.AsyncClient(
+        http2=True,
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+    client = OpenAIChatCompletionClient(
         model=settings.model,
         api_key=settings.api_key,
         base_url=settings.base_url.rstrip("/") + "/",
-        timeout=settings.timeout_seconds,
+        timeout=timeout,
         max_retries=settings.max_retries,
+        http_client=http_client,
         model_info={
             "vision": True,
             "function_calling": True,
@@ -50,3 +84,12 @@ def create_model_client(settings: ModelSettings) -> OpenAIChatCompletionClient:
             "structured_output": True,
         }
     )
+    _clients[settings] = client
+    return client
+
+
+async def close_model_clients() -> None:
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        await client.close()
@@ -1,22 +1,30 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import json
 import os
 import re
 import time
-from typing import Any, AsyncGenerator
+from collections import OrderedDict
+from typing import Any, AsyncGenerator, Callable, Sequence
 
+import orjson
 from autogen_agentchat.agents import AssistantAgent
+from autogen_agentchat.base import TaskResult
 from autogen_agentchat.conditions import MaxMessageTermination
+from autogen_agentchat.messages import ModelClientStreamingChunkEvent
 from autogen_agentchat.teams import SelectorGroupChat
+from rapidfuzz import fuzz, process, utils
 
+from . import cache
 from .model_client import create_model_client, get_model_settings
 from .schemas import GenerationRequest
 from .tools.academic_api import search_author_openalex, search_paper_by_title
 from .tools.image_context import analyze_context_image
 from .tools.web_context import gather_professor_web_context
-from .utils.pdf_parse import extract_text_from_pdf_bytes
+from .utils.pdf_parse import extract_text_from_pdf_file
+from .utils.workers import run_cpu_bound
 
 AGENTS = [
     (1, "CV Parser"),
@@ -29,6 +37,23 @@ AGENTS = [
     (8, "Research Proposal Writer"),
 ]
 
+CV_TEXT_CACHE_SIZE = 128
+# Roughly 3000 tokens of CV text; shared by every prompt that embeds the CV.
+CV_PROMPT_MAX_CHARS = 12000
+# Share of a title's words (longer than 3 characters) a candidate must contain to match.
+TITLE_MATCH_MIN_OVERLAP = 0.45
+# Streamed steps report progress at most once per this many received characters.
+PROGRESS_REPORT_CHARS = 400
+
+_JSON_DECODER = json.JSONDecoder()
+_FENCE_OPEN_RE = re.compile(r"^```(?:json)?")
+_FENCE_CLOSE_RE = re.compile(r"```$")
+_PARA_SPLIT_RE = re.compile(r"\n\s*\n")
+_HEADING_RE = re.compile(r"^\s*#{1,6}\s*(\S.*?)\s*$")
+_LIST_PREFIX_RE = re.compile(r"^\s*[-*0-9.]+\s*")
+
+_cv_text_cache: OrderedDict[str, str] = OrderedDict()
+
 
 def _elapsed_seconds(start_time: float) -> int:
     return max(0, int(time.monotonic() - start_time))
@@ -63,26 +88,49 @@ def _build_status(
 def _extract_json_block(text: str) -> dict[str, Any]:
     cleaned = text.strip()
     try:
-        return json.loads(cleaned)
-    except json.JSONDecodeError:
+        return orjson.loads(cleaned)
+    except orjson.JSONDecodeError:
         pass
 
     if "```" in cleaned:
-        cleaned = re.sub(r"^```(?:json)?", "", cleaned)
-        cleaned = re.sub(r"```$", "", cleaned)
+        cleaned = _FENCE_OPEN_RE.sub("", cleaned)
+        cleaned = _FENCE_CLOSE_RE.sub("", cleaned)
         cleaned = cleaned.strip()
         try:
-            return json.loads(cleaned)
-        except json.JSONDecodeError:
+            return orjson.loads(cleaned)
+        except orjson.JSONDecodeError:
             pass
 
+    # Last resort: decode the first object in place, ignoring any prose around it.
     start = cleaned.find("{")
-    end = cleaned.rfind("}")
-    if start >= 0 and end > start:
-        return json.loads(cleaned[start : end + 1])
+    if start >= 0:
+        return _JSON_DECODER.raw_decode(cleaned, start)[0]
     raise ValueError("No JSON object found in model output")
 
 
+def _prompt_json(value: Any) -> str:
+    return orjson.dumps(value, option=orjson.OPT_SORT_KEYS).decode()
+
+
+# Steps 4-6 share one system message so their requests stay identical through the
+# CONTEXT block; each step's role is stated in its task after the context.
+CONTEXT_SYSTEM_MESSAGE = (
+    "You assist with PhD application outreach. Use the CONTEXT block and follow the "
+    "task that comes after it. Return strict JSON with no markdown."
+)
+
+
+def _context_prefix(
+    user_profile_json: str,
+    professor_profile_json: str,
+    fit_analysis_json: str | None = None,
+) -> str:
+    parts = ["CONTEXT", "APPLICANT:", user_profile_json, "PROFESSOR:", professor_profile_json]
+    if fit_analysis_json is not None:
+        parts.extend(["FIT:", fit_analysis_json])
+    return "\n".join(parts) + "\n---\n"
+
+
 def _extract_text_from_result(result: Any) -> str:
     if isinstance(result, str):
         return result
@@ -96,31 +144,21 @@ def _extract_text_from_result(result: Any) -> str:
         if isinstance(content, str) and content.strip():
             return content
         if isinstance(content, list):
-            parts: list[str] = []
-            for item in content:
-                if isinstance(item, dict) and isinstance(item.get("text"), str):
-                    parts.append(item["text"])
-                elif isinstance(item, str):
-                    parts.append(item)
-            joined = "\n".join(p for p in parts if p.strip()).strip()
+            parts = (item.get("text") if isinstance(item, dict) else item for item in content)
+            joined = "\n".join(p for p in parts if isinstance(p, str) and p.strip()).strip()
             if joined:
                 return joined
     return str(result)
 
 
 def _dedupe_strings(values: list[str]) -> list[str]:
-    result: list[str] = []
-    seen: set[str] = set()
+    # Keyed case-insensitively; the first spelling of each value wins.
+    unique: dict[str, str] = {}
     for value in values:
         normalized = value.strip()
-        if not normalized:
-            continue
-        key = normalized.lower()
-        if key in seen:
-            continue
-        seen.add(key)
-        result.append(normalized)
-    return result
+        if normalized:
+            unique.setdefault(normalized.lower(), normalized)
+    return list(unique.values())
 
 
 def _normalize_paper(paper: dict[str, Any]) -> dict[str, Any]:
@@ -134,6 +172,10 @@ def _normalize_paper(paper: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _paper_key(paper: dict[str, Any]) -> str:
+    return paper.get("url") or str(paper.get("title", "")).strip().lower()
+
+
 def _normalize_professor_profile(
     profile: dict[str, Any],
     *,
@@ -163,20 +205,78 @@ def _normalize_professor_profile(
     )
     merged["email"] = merged.get("email") or fallback.get("email")
     merged["emailSource"] = merged.get("emailSource") or fallback.get("emailSource")
-    merged["researchInterests"] = _dedupe_strings(
+    interests = _dedupe_strings(
         [*fallback.get("researchInterests", []), *(merged.get("researchInterests") or [])]
     )[:8]
-    merged["recentPapers"] = normalized_papers[:8]
-    merged["currentProjects"] = _dedupe_strings(
+    projects = _dedupe_strings(
         merged.get("currentProjects") or fallback.get("currentProjects") or []
     )[:6]
+    # Lists are sorted after truncation so the serialized profile, and with it the
+    # shared prompt prefix, stays byte-identical for the same facts.
+    merged["researchInterests"] = sorted(interests, key=str.lower)
+    merged["recentPapers"] = normalized_papers[:8]
+    merged["currentProjects"] = sorted(projects, key=str.lower)
     merged["labInfo"] = str(merged.get("labInfo") or fallback.get("labInfo") or "Unknown")
     merged["labUrl"] = merged.get("labUrl") or fallback.get("labUrl")
     merged["openPositions"] = merged.get("openPositions") or fallback.get("openPositions")
-    merged["sources"] = _dedupe_strings([*sources, *(merged.get("sources") or [])])
+    merged["sources"] = sorted(_dedupe_strings([*sources, *(merged.get("sources") or [])]))
     return merged
 
 
+async def _run_agent(
+    agent: AssistantAgent, task: str, on_progress: Callable[[str], None] | None
+) -> Any:
+    if on_progress is None:
+        return await agent.run(task=task)
+
+    # on_progress receives the text streamed so far.
+    result: TaskResult | None = None
+    chunks: list[str] = []
+    received = reported = 0
+    async for item in agent.run_stream(task=task):
+        if isinstance(item, ModelClientStreamingChunkEvent):
+            chunks.append(item.content)
+            received += len(item.content)
+            if received - reported >= PROGRESS_REPORT_CHARS:
+                reported = received
+                on_progress("".join(chunks))
+        elif isinstance(item, TaskResult):
+            result = item
+    return result
+
+
+async def _relay_progress(
+    tasks: Sequence[asyncio.Task[Any]], progress: asyncio.Queue[dict[str, Any]]
+) -> AsyncGenerator[dict[str, Any], None]:
+    # Yield queued status updates until every task has finished; the caller reads
+    # the task results afterwards. Unfinished tasks are cancelled if the consumer
+    # stops early.
+    finished = asyncio.gather(*tasks, return_exceptions=True)
+    update: asyncio.Future[dict[str, Any]] | None = None
+    try:
+        while True:
+            update = asyncio.ensure_future(progress.get())
+            done, _ = await asyncio.wait(
+                {finished, update}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if update not in done:
+                break
+            yield update.result()
+    finally:
+        if update is not None:
+            update.cancel()
+        for task in tasks:
+            task.cancel()
+        while not progress.empty():
+            progress.get_nowait()
+
+
+def _result_or_default(task: asyncio.Task[Any], default: Any) -> Any:
+    if task.cancelled() or task.exception() is not None:
+        return default
+    return task.result()
+
+
 async def _run_assistant_json(
     *,
     name: str,
@@ -184,19 +284,30 @@ async def _run_assistant_json(
     task: str,
     model_client: Any,
     default: dict[str, Any],
+    on_progress: Callable[[str], None] | None = None,
 ) -> dict[str, Any]:
+    key_source = f"{name}|{get_model_settings().model}|{system_message}|{task}"
+    cache_key = "llm:" + hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+    cached_output = await cache.get_value(cache_key)
+    if cached_output is not None:
+        return cached_output
+
     agent = AssistantAgent(
         name=name,
         model_client=model_client,
         system_message=system_message,
+        model_client_stream=on_progress is not None,
     )
-    result = await agent.run(task=task)
+    result = await _run_agent(agent, task, on_progress)
     text = _extract_text_from_result(result)
     try:
-        return _extract_json_block(text)
+        parsed = _extract_json_block(text)
     except Exception:
         return default
 
+    await cache.set_value(cache_key, parsed)
+    return parsed
+
 
 async def _run_assistant_text(
     *,
@@ -205,19 +316,21 @@ async def _run_assistant_text(
     task: str,
     model_client: Any,
     default: str,
+    on_progress: Callable[[str], None] | None = None,
 ) -> str:
     agent = AssistantAgent(
         name=name,
         model_client=model_client,
         system_message=system_message,
+        model_client_stream=on_progress is not None,
     )
-    result = await agent.run(task=task)
+    result = await _run_agent(agent, task, on_progress)
     text = _extract_text_from_result(result).strip()
     return text or default
 
 
 def _parse_motivation_sections(text: str) -> list[dict[str, str]]:
-    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    paragraphs = [p.strip() for p in _PARA_SPLIT_RE.split(text) if p.strip()]
     names = [
         "Opening",
         "Academic Background",
@@ -233,54 +346,45 @@ def _parse_motivation_sections(text: str) -> list[dict[str, str]]:
 
 
 def _parse_research_proposal(text: str) -> dict[str, Any]:
-    lines = text.splitlines()
     title = ""
-    abstract_lines: list[str] = []
+    abstract = ""
     sections: list[dict[str, str]] = []
     references: list[str] = []
     current_heading = ""
     current_content: list[str] = []
 
     def flush() -> None:
-        nonlocal current_heading, current_content, abstract_lines
+        nonlocal abstract
         if not current_heading:
             return
         content = "\n".join(current_content).strip()
         if not content:
             return
-        if "abstract" in current_heading.lower():
-            abstract_lines = [content]
-        elif "reference" in current_heading.lower():
-            refs = [re.sub(r"^\s*[-*0-9.]+\s*", "", line).strip() for line in content.splitlines()]
-            references.extend([r for r in refs if r])
+        heading = current_heading.lower()
+        if "abstract" in heading:
+            abstract = content
+        elif "reference" in heading:
+            refs = (_LIST_PREFIX_RE.sub("", line).strip() for line in content.splitlines())
+            references.extend(r for r in refs if r)
         else:
             sections.append({"heading": current_heading, "content": content})
 
-    for line in lines:
-        if not title and line.strip() and not line.strip().startswith("#"):
-            title = line.strip()
-        match = re.match(r"^#{1,6}\s*(.+?)\s*$", line.strip())
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line)
         if match:
             flush()
-            current_heading = match.group(1).strip()
+            current_heading = match.group(1)
             current_content = []
             continue
+        if not title:
+            stripped = line.strip()
+            if stripped and not stripped.startswith("#"):
+                title = stripped
         current_content.append(line)
     flush()
 
-    if not title:
-        title = "Research Proposal"
-
-    abstract = "\n".join(abstract_lines).strip()
-    if not abstract:
-        maybe_abstract = next(
-            (section["content"] for section in sections if "abstract" in section["heading"].lower()),
-            "",
-        )
-        abstract = maybe_abstract
-
     return {
-        "title": title,
+        "title": title or "Research Proposal",
         "abstract": abstract,
         "sections": sections,
         "references": _dedupe_strings(references),
@@ -288,31 +392,58 @@ def _parse_research_proposal(text: str) -> dict[str, Any]:
     }
 
 
+def _remember_cv_text(digest: str, cv_text: str) -> None:
+    _cv_text_cache[digest] = cv_text
+    if len(_cv_text_cache) > CV_TEXT_CACHE_SIZE:
+        _cv_text_cache.popitem(last=False)
+
+
+async def _load_cv_text(request: GenerationRequest) -> str:
+    digest = request.cv_digest
+    if digest and digest in _cv_text_cache:
+        _cv_text_cache.move_to_end(digest)
+        return _cv_text_cache[digest]
+
+    # PDF parsing is CPU-bound; keep it off the event loop so concurrent
+    # pipelines keep streaming.
+    cv_text = await run_cpu_bound(
+        extract_text_from_pdf_file, request.cv_pdf_file, CV_PROMPT_MAX_CHARS
+    )
+    if digest and cv_text.strip():
+        # Raw CV text stays in process memory only; it is never written to disk.
+        _remember_cv_text(digest, cv_text)
+    return cv_text
+
+
 def _fuzzy_match_paper_title(
-    title: str, candidates: list[dict[str, Any]]
+    title: str, candidates: list[dict[str, Any]], lowered_titles: list[str]
 ) -> dict[str, Any] | None:
     wanted = title.lower()
-    for candidate in candidates:
-        candidate_title = str(candidate.get("title", "")).lower()
+    for candidate, candidate_title in zip(candidates, lowered_titles):
         if not candidate_title:
             continue
         if wanted in candidate_title or candidate_title in wanted:
             return candidate
-    words = [w for w in re.split(r"\s+", wanted) if len(w) > 3]
-    best_score = 0.0
-    best_candidate: dict[str, Any] | None = None
-    for candidate in candidates:
-        candidate_title = str(candidate.get("title", "")).lower()
-        if not candidate_title:
-            continue
-        overlap = sum(1 for w in words if w in candidate_title)
-        score = overlap / max(len(words), 1)
-        if score > best_score:
-            best_score = score
-            best_candidate = candidate
-    if best_candidate and best_score >= 0.45:
-        return best_candidate
-    return None
+    # Word overlap decides whether a candidate matches at all; rapidfuzz only
+    # ranks the candidates that pass, so unrelated titles are never accepted.
+    words = [w for w in wanted.split() if len(w) > 3]
+    if not words:
+        return None
+    eligible = [
+        idx
+        for idx, candidate_title in enumerate(lowered_titles)
+        if candidate_title
+        and sum(w in candidate_title for w in words) / len(words) >= TITLE_MATCH_MIN_OVERLAP
+    ]
+    if not eligible:
+        return None
+    match = process.extractOne(
+        title,
+        [lowered_titles[idx] for idx in eligible],
+        scorer=fuzz.token_set_ratio,
+        processor=utils.default_process,
+    )
+    return candidates[eligible[match[2]]]
 
 
 async def run_pipeline_stream(
@@ -337,8 +468,32 @@ async def run_pipeline_stream(
     image_context_used = False
     web_sources: list[str] = []
 
+    # Streamed agent steps push "running" updates here; _relay_progress forwards
+    # them while the step is still in flight.
+    progress: asyncio.Queue[dict[str, Any]] = asyncio.Queue()
+
+    def report_progress(
+        step: int, action: str, *, words: bool = False
+    ) -> Callable[[str], None]:
+        def report(received: str) -> None:
+            if words:
+                detail = f"{len(received.split()):,} words so far"
+            else:
+                detail = f"{len(received):,} characters received"
+            progress.put_nowait(
+                _build_status(
+                    step=step,
+                    name=step_name[step],
+                    status="running",
+                    current_action=f"{action} ({detail})",
+                    start_time=start_time,
+                )
+            )
+
+        return report
+
     try:
-        cv_text = extract_text_from_pdf_bytes(request.cv_pdf_bytes)
+        cv_text = await _load_cv_text(request)
         if not cv_text.strip():
             raise RuntimeError("Could not extract text from CV PDF")
 
@@ -351,34 +506,40 @@ async def run_pipeline_stream(
             start_time=start_time,
         )
 
-        user_profile = await _run_assistant_json(
-            name="cv_parser",
-            model_client=model_client,
-            system_message=(
-                "You extract structured CV information. Always return strict JSON with no markdown."
-            ),
-            task=(
-                "Extract structured profile data from this CV text.\n"
-                "Return JSON:\n"
-                "{\n"
-                '  "name": string,\n'
-                '  "education": [{"degree": string, "institution": string, "year": number, "gpa": string, "thesis": string}],\n'
-                '  "experience": [{"title": string, "organization": string, "dates": string, "description": string, "skills": [string]}],\n'
-                '  "publications": [{"title": string, "venue": string, "year": number, "role": "first_author|co_author"}],\n'
-                '  "skills": [string],\n'
-                '  "summary": string\n'
-                "}\n\n"
-                f"CV:\n{cv_text[:12000]}"
-            ),
-            default={
-                "name": "Applicant",
-                "education": [],
-                "experience": [],
-                "publications": [],
-                "skills": [],
-                "summary": "PhD applicant profile extracted from CV.",
-            },
+        cv_parse_task = asyncio.create_task(
+            _run_assistant_json(
+                name="cv_parser",
+                model_client=model_client,
+                system_message=(
+                    "You extract structured CV information. Always return strict JSON with no markdown."
+                ),
+                task=(
+                    "Extract structured profile data from this CV text.\n"
+                    "Return JSON:\n"
+                    "{\n"
+                    '  "name": string,\n'
+                    '  "education": [{"degree": string, "institution": string, "year": number, "gpa": string, "thesis": string}],\n'
+                    '  "experience": [{"title": string, "organization": string, "dates": string, "description": string, "skills": [string]}],\n'
+                    '  "publications": [{"title": string, "venue": string, "year": number, "role": "first_author|co_author"}],\n'
+                    '  "skills": [string],\n'
+                    '  "summary": string\n'
+                    "}\n\n"
+                    f"CV:\n{cv_text}"
+                ),
+                default={
+                    "name": "Applicant",
+                    "education": [],
+                    "experience": [],
+                    "publications": [],
+                    "skills": [],
+                    "summary": "PhD applicant profile extracted from CV.",
+                },
+                on_progress=report_progress(1, "Analyzing CV structure"),
+            )
         )
+        async for update in _relay_progress([cv_parse_task], progress):
+            yield "status", update
+        user_profile = cv_parse_task.result()
         if not user_profile.get("name"):
             user_profile["name"] = "Applicant"
 
@@ -401,17 +562,7 @@ async def run_pipeline_stream(
             start_time=start_time,
         )
 
-        author_profile = await search_author_openalex(
-            request.input.professorName, request.input.university
-        )
-        source_links: list[str] = []
-        seed_papers = (author_profile or {}).get("papers") or []
-
-        if author_profile and author_profile.get("source"):
-            source_links.append(str(author_profile["source"]))
-
-        image_context: dict[str, Any] = {"available": False}
-        if request.context_image_bytes:
+        if request.context_image_file is not None:
             image_context_used = True
             yield "status", _build_status(
                 step=2,
@@ -420,18 +571,47 @@ async def run_pipeline_stream(
                 current_action="Analyzing optional image context...",
                 start_time=start_time,
             )
-            try:
-                image_context = await analyze_context_image(
-                    request.context_image_bytes,
-                    request.context_image_content_type,
-                    request.context_image_filename,
-                    api_key=settings.api_key,
-                    model=settings.model,
-                    base_url=settings.base_url,
-                    timeout_seconds=min(45, settings.timeout_seconds),
-                )
-            except Exception:
-                image_context = {"available": False}
+
+        yield "status", _build_status(
+            step=2,
+            name=step_name[2],
+            status="running",
+            current_action="Browsing academic web sources...",
+            start_time=start_time,
+        )
+
+        # The academic lookup, image analysis and web browsing hit different services,
+        # so run them together. A single gather means cancelling this generator (the
+        # client went away) cancels all three instead of leaving any running.
+        # asyncio.sleep(0, value) stands in for the image task when there is no image.
+        author_result, image_result, web_result = await asyncio.gather(
+            search_author_openalex(request.input.professorName, request.input.university),
+            analyze_context_image(
+                request.context_image_file.read(),
+                request.context_image_content_type,
+                request.context_image_filename,
+                api_key=settings.api_key,
+                model=settings.model,
+                base_url=settings.base_url,
+                timeout_seconds=min(45, settings.timeout_seconds),
+            )
+            if request.context_image_file is not None
+            else asyncio.sleep(0, {"available": False}),
+            gather_professor_web_context(
+                request.input.professorName,
+                request.input.university,
+                max_steps=int(os.getenv("WEB_MAX_STEPS", "6")),
+                timeout_seconds=int(os.getenv("WEB_TIMEOUT_SECONDS", "90")),
+                preferred_domains=[],
+            ),
+            return_exceptions=True,
+        )
+        author_profile = None if isinstance(author_result, BaseException) else author_result
+        source_links: list[str] = []
+        seed_papers = (author_profile or {}).get("papers") or []
+
+        if author_profile and author_profile.get("source"):
+            source_links.append(str(author_profile["source"]))
 
         seed_profile = {
             "name": request.input.professorName,
@@ -455,25 +635,14 @@ async def run_pipeline_stream(
         interest_count = len(seed_profile["researchInterests"])
         paper_count = len(seed_profile["recentPapers"])
         needs_web_context = missing_email or interest_count < 3 or paper_count < 3
+
+        image_context: dict[str, Any] = (
+            {"available": False} if isinstance(image_result, BaseException) else image_result
+        )
         web_context: dict[str, Any] = {"sources": [], "snippets": [], "researchInterests": []}
 
-        if needs_web_context:
-            yield "status", _build_status(
-                step=2,
-                name=step_name[2],
-                status="running",
-                current_action="Browsing academic web sources...",
-                start_time=start_time,
-            )
-            max_steps = int(os.getenv("WEB_MAX_STEPS", "6"))
-            timeout_seconds = int(os.getenv("WEB_TIMEOUT_SECONDS", "90"))
-            web_context = await gather_professor_web_context(
-                request.input.professorName,
-                request.input.university,
-                max_steps=max_steps,
-                timeout_seconds=timeout_seconds,
-                preferred_domains=[],
-            )
+        if needs_web_context and not isinstance(web_result, BaseException):
+            web_context = web_result
             web_steps_used = int(web_context.get("webStepsUsed") or 0)
             web_sources = [str(url) for url in web_context.get("sources") or []]
 
@@ -601,7 +770,7 @@ async def run_pipeline_stream(
                 '  "shouldSearchMore": boolean\n'
                 "}\n\n"
                 f"Applicant research interests: {request.input.researchInterests}\n"
-                f"Candidate papers:\n{json.dumps(candidate_papers[:10], ensure_ascii=True)}\n"
+                f"Candidate papers:\n{_prompt_json(candidate_papers[:10])}\n"
             )
         )
         selection_text = _extract_text_from_result(selection_result)
@@ -610,29 +779,48 @@ async def run_pipeline_stream(
         except Exception:
             selection_json = {"selectedPapers": [], "reasoning": "", "shouldSearchMore": False}
 
+        choices = [
+            choice
+            for choice in selection_json.get("selectedPapers", [])[:3]
+            if isinstance(choice, dict)
+        ]
+        lowered_titles = [str(paper.get("title", "")).lower() for paper in candidate_papers]
+        matches = [
+            _fuzzy_match_paper_title(
+                str(choice.get("title", "")), candidate_papers, lowered_titles
+            )
+            for choice in choices
+        ]
+        unmatched = [choice for choice, matched in zip(choices, matches) if not matched]
+        lookups = iter(
+            await asyncio.gather(
+                *(
+                    search_paper_by_title(str(choice.get("title", "")), choice.get("keywords"))
+                    for choice in unmatched
+                ),
+                return_exceptions=True,
+            )
+        )
+
         selected_papers: list[dict[str, Any]] = []
-        for choice in selection_json.get("selectedPapers", [])[:3]:
-            if not isinstance(choice, dict):
-                continue
-            matched = _fuzzy_match_paper_title(str(choice.get("title", "")), candidate_papers)
+        for choice, matched in zip(choices, matches):
             if matched:
                 selected = dict(matched)
                 selected["selectionReason"] = choice.get("reason", "Selected for relevance.")
                 selected_papers.append(selected)
                 continue
 
-            looked_up = await search_paper_by_title(
-                str(choice.get("title", "")), choice.get("keywords")
-            )
-            if looked_up:
+            looked_up = next(lookups)
+            if isinstance(looked_up, dict):
                 looked_up["selectionReason"] = choice.get("reason", "Found via lookup.")
                 selected_papers.append(looked_up)
 
         if not selected_papers:
             selected_papers = candidate_papers[:3]
 
+        selected_keys = {_paper_key(paper) for paper in selected_papers}
         professor_profile["recentPapers"] = selected_papers + [
-            p for p in candidate_papers if p not in selected_papers
+            p for p in candidate_papers if _paper_key(p) not in selected_keys
         ]
 
         yield "status", _build_status(
@@ -650,6 +838,13 @@ async def run_pipeline_stream(
             },
         )
 
+        # The profiles are final from here on; serialize them once for every later
+        # prompt. Steps 4-6 send the same system message and open with the same context
+        # so the provider can reuse its cached prefill across these calls.
+        user_profile_json = _prompt_json(user_profile)
+        professor_profile_json = _prompt_json(professor_profile)
+        profile_context = _context_prefix(user_profile_json, professor_profile_json)
+
         # Step 4: Fit Analyzer
         yield "status", _build_status(
             step=4,
@@ -659,42 +854,47 @@ async def run_pipeline_stream(
             start_time=start_time,
         )
 
-        fit_analysis = await _run_assistant_json(
-            name="fit_analyzer",
-            model_client=model_client,
-            system_message="You evaluate fit and return strict JSON.",
-            task=(
-                "Analyze fit between applicant and professor.\n"
-                "Return JSON:\n"
-                "{\n"
-                '  "overallFit": "high|medium|low",\n'
-                '  "keyOverlaps": [string],\n'
-                '  "gaps": [string],\n'
-                '  "bestPaperToReference": {"title": string, "year": number, "abstract": string, "url": string, "venue": string},\n'
-                '  "suggestedAngle": string\n'
-                "}\n\n"
-                f"Applicant: {json.dumps(user_profile, ensure_ascii=True)}\n"
-                f"Professor: {json.dumps(professor_profile, ensure_ascii=True)}\n"
-                f"Research interests: {request.input.researchInterests}\n"
-                f"Additional notes: {request.input.additionalNotes}\n"
-                f"Posting: {request.input.postingContent}\n"
-            ),
-            default={
-                "overallFit": "medium",
-                "keyOverlaps": ["Research alignment identified."],
-                "gaps": [],
-                "bestPaperToReference": selected_papers[0]
-                if selected_papers
-                else {
-                    "title": "Recent research paper",
-                    "year": 2025,
-                    "abstract": "",
-                    "url": "",
-                    "venue": "",
+        fit_task = asyncio.create_task(
+            _run_assistant_json(
+                name="fit_analyzer",
+                model_client=model_client,
+                system_message=CONTEXT_SYSTEM_MESSAGE,
+                task=(
+                    f"{profile_context}"
+                    "You evaluate fit. Analyze fit between applicant and professor.\n"
+                    "Return JSON:\n"
+                    "{\n"
+                    '  "overallFit": "high|medium|low",\n'
+                    '  "keyOverlaps": [string],\n'
+                    '  "gaps": [string],\n'
+                    '  "bestPaperToReference": {"title": string, "year": number, "abstract": string, "url": string, "venue": string},\n'
+                    '  "suggestedAngle": string\n'
+                    "}\n\n"
+                    f"Research interests: {request.input.researchInterests}\n"
+                    f"Additional notes: {request.input.additionalNotes}\n"
+                    f"Posting: {request.input.postingContent}\n"
+                ),
+                default={
+                    "overallFit": "medium",
+                    "keyOverlaps": ["Research alignment identified."],
+                    "gaps": [],
+                    "bestPaperToReference": selected_papers[0]
+                    if selected_papers
+                    else {
+                        "title": "Recent research paper",
+                        "year": 2025,
+                        "abstract": "",
+                        "url": "",
+                        "venue": "",
+                    },
+                    "suggestedAngle": "Applicant background aligns with current lab direction.",
                 },
-                "suggestedAngle": "Applicant background aligns with current lab direction.",
-            },
+                on_progress=report_progress(4, "Analyzing applicant-professor fit"),
+            )
         )
+        async for update in _relay_progress([fit_task], progress):
+            yield "status", update
+        fit_analysis = fit_task.result()
 
         yield "status", _build_status(
             step=4,
@@ -706,7 +906,11 @@ async def run_pipeline_stream(
             output=fit_analysis,
         )
 
-        # Step 5: Email Writer
+        fit_analysis_json = _prompt_json(fit_analysis)
+        fit_context = _context_prefix(user_profile_json, professor_profile_json, fit_analysis_json)
+
+        # Steps 5 and 6 only depend on the profiles and the fit analysis, so the email
+        # and the CV recommendations are drafted concurrently.
         yield "status", _build_status(
             step=5,
             name=step_name[5],
@@ -715,40 +919,78 @@ async def run_pipeline_stream(
             start_time=start_time,
         )
 
-        email_output = await _run_assistant_json(
-            name="email_writer",
-            model_client=model_client,
-            system_message=(
-                "Write specific professor outreach emails. Return strict JSON with no markdown."
-            ),
-            task=(
-                "Generate a 200-250 word PhD outreach email.\n"
-                "Return JSON:\n"
-                "{\n"
-                '  "subjectOptions": [string, string, string],\n'
-                '  "body": string,\n'
-                '  "wordCount": number,\n'
-                '  "referencedPaper": {"title": string, "url": string},\n'
-                '  "effectivenessNote": string\n'
-                "}\n\n"
-                f"Language: {request.input.customLanguage or request.input.language}\n"
-                f"Funding status: {request.input.fundingStatus}\n"
-                f"Preferred start: {request.input.preferredStart}\n"
-                f"Applicant profile: {json.dumps(user_profile, ensure_ascii=True)}\n"
-                f"Professor profile: {json.dumps(professor_profile, ensure_ascii=True)}\n"
-                f"Fit analysis: {json.dumps(fit_analysis, ensure_ascii=True)}\n"
-            ),
-            default={
-                "subjectOptions": ["PhD inquiry regarding your recent research"],
-                "body": "Dear Professor, I am writing to express my interest in your research.",
-                "wordCount": 14,
-                "referencedPaper": {
-                    "title": fit_analysis.get("bestPaperToReference", {}).get("title", ""),
-                    "url": fit_analysis.get("bestPaperToReference", {}).get("url", ""),
+        yield "status", _build_status(
+            step=6,
+            name=step_name[6],
+            status="running",
+            current_action="Generating CV recommendations...",
+            start_time=start_time,
+        )
+
+        email_task = asyncio.create_task(
+            _run_assistant_json(
+                name="email_writer",
+                model_client=model_client,
+                system_message=CONTEXT_SYSTEM_MESSAGE,
+                task=(
+                    f"{fit_context}"
+                    "You write specific professor outreach emails. "
+                    "Generate a 200-250 word PhD outreach email.\n"
+                    "Return JSON:\n"
+                    "{\n"
+                    '  "subjectOptions": [string, string, string],\n'
+                    '  "body": string,\n'
+                    '  "wordCount": number,\n'
+                    '  "referencedPaper": {"title": string, "url": string},\n'
+                    '  "effectivenessNote": string\n'
+                    "}\n\n"
+                    f"Language: {request.input.customLanguage or request.input.language}\n"
+                    f"Funding status: {request.input.fundingStatus}\n"
+                    f"Preferred start: {request.input.preferredStart}\n"
+                ),
+                default={
+                    "subjectOptions": ["PhD inquiry regarding your recent research"],
+                    "body": "Dear Professor, I am writing to express my interest in your research.",
+                    "wordCount": 14,
+                    "referencedPaper": {
+                        "title": fit_analysis.get("bestPaperToReference", {}).get("title", ""),
+                        "url": fit_analysis.get("bestPaperToReference", {}).get("url", ""),
+                    },
+                    "effectivenessNote": "Fallback draft.",
                 },
-                "effectivenessNote": "Fallback draft.",
-            },
+                on_progress=report_progress(5, "Writing personalized email"),
+            )
+        )
+        cv_task = asyncio.create_task(
+            _run_assistant_json(
+                name="cv_recommender",
+                model_client=model_client,
+                system_message=CONTEXT_SYSTEM_MESSAGE,
+                task=(
+                    f"{fit_context}"
+                    "You give actionable CV tailoring advice. "
+                    "Provide targeted CV recommendations.\n"
+                    "Return JSON:\n"
+                    "{\n"
+                    '  "updates": [{"section": string, "currentText": string, "suggestedText": string, "reason": string, "priority": "high|medium|low"}],\n'
+                    '  "keepAsIs": [{"section": string, "reason": string}],\n'
+                    '  "removeOrDeemphasize": [{"section": string, "reason": string}],\n'
+                    '  "formatSuggestions": [string]\n'
+                    "}\n\n"
+                    f"CV text:\n{cv_text}\n"
+                ),
+                default={
+                    "updates": [],
+                    "keepAsIs": [],
+                    "removeOrDeemphasize": [],
+                    "formatSuggestions": [],
+                },
+                on_progress=report_progress(6, "Generating CV recommendations"),
+            )
         )
+        async for update in _relay_progress([email_task, cv_task], progress):
+            yield "status", update
+        email_output, cv_recommendations = email_task.result(), cv_task.result()
         email_output["wordCount"] = len(str(email_output.get("body", "")).split())
         if not email_output.get("referencedPaper"):
             best_paper = fit_analysis.get("bestPaperToReference", {})
@@ -767,40 +1009,6 @@ async def run_pipeline_stream(
             output=email_output,
         )
 
-        # Step 6: CV Recommender
-        yield "status", _build_status(
-            step=6,
-            name=step_name[6],
-            status="running",
-            current_action="Generating CV recommendations...",
-            start_time=start_time,
-        )
-
-        cv_recommendations = await _run_assistant_json(
-            name="cv_recommender",
-            model_client=model_client,
-            system_message="Return actionable CV tailoring advice as strict JSON.",
-            task=(
-                "Provide targeted CV recommendations.\n"
-                "Return JSON:\n"
-                "{\n"
-                '  "updates": [{"section": string, "currentText": string, "suggestedText": string, "reason": string, "priority": "high|medium|low"}],\n'
-                '  "keepAsIs": [{"section": string, "reason": string}],\n'
-                '  "removeOrDeemphasize": [{"section": string, "reason": string}],\n'
-                '  "formatSuggestions": [string]\n'
-                "}\n\n"
-                f"CV text:\n{cv_text[:10000]}\n"
-                f"Applicant profile: {json.dumps(user_profile, ensure_ascii=True)}\n"
-                f"Professor profile: {json.dumps(professor_profile, ensure_ascii=True)}\n"
-                f"Fit analysis: {json.dumps(fit_analysis, ensure_ascii=True)}\n"
-            ),
-            default={
-                "updates": [],
-                "keepAsIs": [],
-                "removeOrDeemphasize": [],
-                "formatSuggestions": [],
-            },
-        )
         cv_recommendations["updates"] = cv_recommendations.get("updates") or []
         cv_recommendations["keepAsIs"] = cv_recommendations.get("keepAsIs") or []
         cv_recommendations["removeOrDeemphasize"] = (
@@ -818,7 +1026,9 @@ async def run_pipeline_stream(
             output=cv_recommendations,
         )
 
-        # Step 7: Motivation Letter Writer
+        # Steps 7 and 8 only read results that are already final, so the motivation
+        # letter and the research proposal are written concurrently. A failed writer
+        # falls back to its default text instead of failing the other one.
         yield "status", _build_status(
             step=7,
             name=step_name[7],
@@ -827,21 +1037,59 @@ async def run_pipeline_stream(
             start_time=start_time,
         )
 
-        motivation_text = await _run_assistant_text(
-            name="motivation_writer",
-            model_client=model_client,
-            system_message="Write strong academic motivation letters.",
-            task=(
-                "Write a 600-800 word motivation letter for this application.\n"
-                f"Language: {request.input.customLanguage or request.input.language}\n"
-                f"Applicant profile: {json.dumps(user_profile, ensure_ascii=True)}\n"
-                f"Professor profile: {json.dumps(professor_profile, ensure_ascii=True)}\n"
-                f"Fit analysis: {json.dumps(fit_analysis, ensure_ascii=True)}\n"
-                f"Email draft: {json.dumps(email_output, ensure_ascii=True)}\n"
-                f"Additional notes: {request.input.additionalNotes}\n"
-            ),
-            default="Motivation letter could not be generated.",
+        yield "status", _build_status(
+            step=8,
+            name=step_name[8],
+            status="running",
+            current_action="Drafting research proposal...",
+            start_time=start_time,
+        )
+
+        motivation_default = "Motivation letter could not be generated."
+        proposal_default = "Research proposal generation failed."
+        motivation_task = asyncio.create_task(
+            _run_assistant_text(
+                name="motivation_writer",
+                model_client=model_client,
+                system_message="Write strong academic motivation letters.",
+                task=(
+                    "Write a 600-800 word motivation letter for this application.\n"
+                    f"Language: {request.input.customLanguage or request.input.language}\n"
+                    f"Applicant profile: {user_profile_json}\n"
+                    f"Professor profile: {professor_profile_json}\n"
+                    f"Fit analysis: {fit_analysis_json}\n"
+                    f"Email draft: {_prompt_json(email_output)}\n"
+                    f"Additional notes: {request.input.additionalNotes}\n"
+                ),
+                default=motivation_default,
+                on_progress=report_progress(7, "Writing motivation letter", words=True),
+            )
         )
+        proposal_task = asyncio.create_task(
+            _run_assistant_text(
+                name="proposal_writer",
+                model_client=model_client,
+                system_message="Write rigorous and feasible PhD research proposals.",
+                task=(
+                    "Write a 1500-2000 word research proposal with markdown headings.\n"
+                    "Required sections: Title, Abstract, Introduction, Research Questions, "
+                    "Methodology, Expected Contributions, Preliminary Work, References.\n"
+                    f"Language: {request.input.customLanguage or request.input.language}\n"
+                    f"Applicant profile: {user_profile_json}\n"
+                    f"Professor profile: {professor_profile_json}\n"
+                    f"Fit analysis: {fit_analysis_json}\n"
+                    f"Research interests: {request.input.researchInterests}\n"
+                    f"Posting content: {request.input.postingContent}\n"
+                ),
+                default=proposal_default,
+                on_progress=report_progress(8, "Drafting research proposal", words=True),
+            )
+        )
+        async for update in _relay_progress([motivation_task, proposal_task], progress):
+            yield "status", update
+        motivation_text = _result_or_default(motivation_task, motivation_default)
+        proposal_text = _result_or_default(proposal_task, proposal_default)
+
         motivation_output = {
             "letter": motivation_text.strip(),
             "wordCount": len(motivation_text.split()),
@@ -858,32 +1106,6 @@ async def run_pipeline_stream(
             output=motivation_output,
         )
 
-        # Step 8: Research Proposal Writer
-        yield "status", _build_status(
-            step=8,
-            name=step_name[8],
-            status="running",
-            current_action="Drafting research proposal...",
-            start_time=start_time,
-        )
-
-        proposal_text = await _run_assistant_text(
-            name="proposal_writer",
-            model_client=model_client,
-            system_message="Write rigorous and feasible PhD research proposals.",
-            task=(
-                "Write a 1500-2000 word research proposal with markdown headings.\n"
-                "Required sections: Title, Abstract, Introduction, Research Questions, "
-                "Methodology, Expected Contributions, Preliminary Work, References.\n"
-                f"Language: {request.input.customLanguage or request.input.language}\n"
-                f"Applicant profile: {json.dumps(user_profile, ensure_ascii=True)}\n"
-                f"Professor profile: {json.dumps(professor_profile, ensure_ascii=True)}\n"
-                f"Fit analysis: {json.dumps(fit_analysis, ensure_ascii=True)}\n"
-                f"Research interests: {request.input.researchInterests}\n"
-                f"Posting content: {request.input.postingContent}\n"
-            ),
-            default="Research proposal generation failed.",
-        )
         research_proposal = _parse_research_proposal(proposal_text)
 
         yield "status", _build_status(
@@ -920,9 +1142,3 @@ async def run_pipeline_stream(
         yield "complete", result_payload
     except Exception as exc:
         yield "error", {"error": str(exc)}
-    finally:
-        close_method = getattr(model_client, "close", None)
-        if close_method:
-            maybe_coro = close_method()
-            if asyncio.iscoroutine(maybe_coro):
-                await maybe_coro
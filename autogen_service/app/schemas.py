@@ -1,12 +1,15 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Literal
+from typing import IO, Any, Literal
 
-from pydantic import BaseModel, Field
+from fastapi import Form, HTTPException
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
 
 
 class UserInput(BaseModel):
+    model_config = ConfigDict(str_strip_whitespace=True)
+
     professorName: str
     university: str
     language: Literal["english", "german", "french", "other"] = "english"
@@ -19,16 +22,65 @@ class UserInput(BaseModel):
     additionalNotes: str = ""
     postingContent: str = ""
 
+    @field_validator("language", "fundingStatus", mode="before")
+    @classmethod
+    def _lower(cls, value: Any) -> Any:
+        return value.strip().lower() if isinstance(value, str) else value
+
+    @field_validator("customLanguage")
+    @classmethod
+    def _blank_to_none(cls, value: str | None) -> str | None:
+        return value or None
+
+    @field_validator("preferredStart")
+    @classmethod
+    def _default_start(cls, value: str) -> str:
+        return value or "Fall 2026"
+
+    @classmethod
+    def as_form(
+        cls,
+        professorName: str = Form(...),
+        university: str = Form(...),
+        language: str = Form("english"),
+        customLanguage: str = Form(""),
+        fundingStatus: str = Form("fully_funded"),
+        researchInterests: str = Form(""),
+        preferredStart: str = Form("Fall 2026"),
+        additionalNotes: str = Form(""),
+        postingContent: str = Form(""),
+    ) -> UserInput:
+        try:
+            return cls(
+                professorName=professorName,
+                university=university,
+                language=language,
+                customLanguage=customLanguage,
+                fundingStatus=fundingStatus,
+                researchInterests=researchInterests,
+                preferredStart=preferredStart,
+                additionalNotes=additionalNotes,
+                postingContent=postingContent,
+            )
+        except ValidationError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from exc
+
 
 @dataclass
 class GenerationRequest:
     input: UserInput
-    cv_pdf_bytes: bytes
+    cv_pdf_file: IO[bytes]
     cv_filename: str | None = None
-    context_image_bytes: bytes | None = None
+    cv_digest: str | None = None
+    context_image_file: IO[bytes] | None = None
     context_image_content_type: str | None = None
     context_image_filename: str | None = None
 
+    def close(self) -> None:
+        self.cv_pdf_file.close()
+        if self.context_image_file is not None:
+            self.context_image_file.close()
+
 
 class AgentStatus(BaseModel):
     step: int
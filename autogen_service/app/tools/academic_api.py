@@ -1,24 +1,62 @@
 from __future__ import annotations
 
+import asyncio
+import re
 from typing import Any
 from urllib.parse import quote
 
 import httpx
 
+from ..cache import cached
+
 OPENALEX_API = "https://api.openalex.org"
 DEFAULT_USER_AGENT = "PhDApply-AutoGen/1.0 (mailto:contact@example.com)"
+MAX_CONNECTIONS = 40
+MAX_KEEPALIVE_CONNECTIONS = 20
+_WORD_RE = re.compile(r"\w+")
+# Only the fields _normalize_work reads; OpenAlex otherwise returns full work records.
+WORK_FIELDS = (
+    "id,doi,title,publication_year,abstract_inverted_index,authorships,"
+    "primary_location,best_oa_location,locations,cited_by_count"
+)
+
+_client: httpx.AsyncClient | None = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    # One pooled HTTP/2 client keeps the OpenAlex connection warm across lookups.
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=25.0,
+            headers={"Accept": "application/json", "User-Agent": DEFAULT_USER_AGENT},
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+    return _client
+
+
+async def close_academic_client() -> None:
+    global _client
+    client, _client = _client, None
+    if client is not None:
+        await client.aclose()
 
 
 def _inverted_index_to_text(inverted_index: dict[str, list[int]] | None) -> str:
     if not inverted_index:
         return ""
 
-    words: list[tuple[str, int]] = []
+    # Positions are dense word offsets, so place each word by index instead of sorting.
+    size = 1 + max((pos for positions in inverted_index.values() for pos in positions), default=-1)
+    words = [""] * size
     for word, positions in inverted_index.items():
         for pos in positions:
-            words.append((word, pos))
-    words.sort(key=lambda item: item[1])
-    return " ".join(word for word, _ in words)
+            words[pos] = word
+    return " ".join(word for word in words if word)
 
 
 def _is_valid_pdf_url(url: str | None) -> bool:
@@ -37,21 +75,14 @@ def _is_valid_pdf_url(url: str | None) -> bool:
 
 
 def _normalize_work(work: dict[str, Any]) -> dict[str, Any]:
-    pdf_url: str | None = None
     best_oa_location = work.get("best_oa_location") or {}
     primary_location = work.get("primary_location") or {}
-    locations = work.get("locations") or []
-
-    if _is_valid_pdf_url(best_oa_location.get("pdf_url")):
-        pdf_url = best_oa_location.get("pdf_url")
-    elif _is_valid_pdf_url(primary_location.get("pdf_url")):
-        pdf_url = primary_location.get("pdf_url")
-    else:
-        for location in locations:
-            candidate = location.get("pdf_url")
-            if _is_valid_pdf_url(candidate):
-                pdf_url = candidate
-                break
+    pdf_candidates = (
+        best_oa_location.get("pdf_url"),
+        primary_location.get("pdf_url"),
+        *(location.get("pdf_url") for location in work.get("locations") or []),
+    )
+    pdf_url = next((url for url in pdf_candidates if _is_valid_pdf_url(url)), None)
 
     doi = work.get("doi")
     return {
@@ -59,9 +90,9 @@ def _normalize_work(work: dict[str, Any]) -> dict[str, Any]:
         "year": work.get("publication_year") or 0,
         "abstract": _inverted_index_to_text(work.get("abstract_inverted_index")),
         "authors": [
-            a.get("author", {}).get("display_name", "")
-            for a in (work.get("authorships") or [])
-            if a.get("author", {}).get("display_name")
+            name
+            for authorship in work.get("authorships") or []
+            if (name := (authorship.get("author") or {}).get("display_name"))
         ],
         "venue": (primary_location.get("source") or {}).get("display_name", ""),
         "citationCount": work.get("cited_by_count") or 0,
@@ -71,70 +102,72 @@ def _normalize_work(work: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+@cached()
 async def search_author_openalex(
     author_name: str, affiliation: str | None = None
 ) -> dict[str, Any] | None:
     params = {"search": author_name, "per_page": 10}
-    headers = {"Accept": "application/json", "User-Agent": DEFAULT_USER_AGENT}
-
-    async with httpx.AsyncClient(timeout=25.0) as client:
-        search_resp = await client.get(f"{OPENALEX_API}/authors", params=params, headers=headers)
-        if search_resp.status_code != 200:
-            return None
-
-        search_data = search_resp.json()
-        candidates = search_data.get("results") or []
-        if not candidates:
-            return None
-
-        selected = candidates[0]
-        if affiliation:
-            affiliation_lower = affiliation.lower()
-            for candidate in candidates:
-                institutions = candidate.get("last_known_institutions") or []
-                if any(
-                    (inst.get("display_name") or "").lower().find(affiliation_lower) >= 0
-                    for inst in institutions
-                ):
-                    selected = candidate
-                    break
-                last_known = candidate.get("last_known_institution") or {}
-                if affiliation_lower in (last_known.get("display_name") or "").lower():
-                    selected = candidate
-                    break
-
-        author_id = selected.get("id")
-        if not author_id:
-            return None
-
-        recent_url = f"{OPENALEX_API}/works"
-        recent_params = {
-            "filter": f"author.id:{author_id}",
-            "sort": "publication_date:desc",
-            "per_page": 12,
-        }
-        cited_params = {
-            "filter": f"author.id:{author_id}",
-            "sort": "cited_by_count:desc",
-            "per_page": 12,
-        }
-
-        recent_resp, cited_resp = await client.get(
-            recent_url, params=recent_params, headers=headers
-        ), await client.get(recent_url, params=cited_params, headers=headers)
-
-        recent_results = (
-            (recent_resp.json().get("results") or []) if recent_resp.status_code == 200 else []
-        )
-        cited_results = (
-            (cited_resp.json().get("results") or []) if cited_resp.status_code == 200 else []
-        )
+    client = _get_client()
+    search_resp = await client.get(f"{OPENALEX_API}/authors", params=params)
+    if search_resp.status_code != 200:
+        return None
+
+    search_data = search_resp.json()
+    candidates = search_data.get("results") or []
+    if not candidates:
+        return None
+
+    selected = candidates[0]
+    if affiliation:
+        affiliation_lower = affiliation.lower()
+        for candidate in candidates:
+            institutions = candidate.get("last_known_institutions") or []
+            if any(
+                (inst.get("display_name") or "").lower().find(affiliation_lower) >= 0
+                for inst in institutions
+            ):
+                selected = candidate
+                break
+            last_known = candidate.get("last_known_institution") or {}
+            if affiliation_lower in (last_known.get("display_name") or "").lower():
+                selected = candidate
+                break
+
+    author_id = selected.get("id")
+    if not author_id:
+        return None
+
+    recent_url = f"{OPENALEX_API}/works"
+    recent_params = {
+        "filter": f"author.id:{author_id}",
+        "sort": "publication_date:desc",
+        "per_page": 12,
+        "select": WORK_FIELDS,
+    }
+    cited_params = {
+        "filter": f"author.id:{author_id}",
+        "sort": "cited_by_count:desc",
+        "per_page": 12,
+        "select": WORK_FIELDS,
+    }
+
+    recent_resp, cited_resp = await asyncio.gather(
+        client.get(recent_url, params=recent_params),
+        client.get(recent_url, params=cited_params),
+    )
+
+    recent_results = (
+        (recent_resp.json().get("results") or []) if recent_resp.status_code == 200 else []
+    )
+    cited_results = (
+        (cited_resp.json().get("results") or []) if cited_resp.status_code == 200 else []
+    )
 
     merged: list[dict[str, Any]] = []
     seen_titles: set[str] = set()
     for work in [*recent_results, *cited_results]:
         normalized = _normalize_work(work)
-        title_key = normalized["title"].strip().lower()
+        title_key = " ".join(normalized["title"].casefold().split())
         if not title_key or title_key in seen_titles:
             continue
         seen_titles.add(title_key)
@@ -163,6 +196,7 @@ async def search_author_openalex(
     }
 
 
+@cached()
 async def search_paper_by_title(
     title: str, keywords: list[str] | None = None
 ) -> dict[str, Any] | None:
@@ -170,18 +204,15 @@ async def search_paper_by_title(
     if keywords:
         query = f"{title} {' '.join(keywords)}"
 
-    params = {"search": query, "per_page": 8}
-    headers = {"Accept": "application/json", "User-Agent": DEFAULT_USER_AGENT}
-
-    async with httpx.AsyncClient(timeout=20.0) as client:
-        response = await client.get(f"{OPENALEX_API}/works", params=params, headers=headers)
-        if response.status_code != 200:
-            return None
-        works = response.json().get("results") or []
+    params = {"search": query, "per_page": 8, "select": WORK_FIELDS}
+    response = await _get_client().get(f"{OPENALEX_API}/works", params=params, timeout=20.0)
+    if response.status_code != 200:
+        return None
+    works = response.json().get("results") or []
 
-    title_words = [w for w in title.lower().split() if len(w) > 3]
-    if not title_words:
-        title_words = title.lower().split()
+    all_words = set(_WORD_RE.findall(title.lower()))
+    title_words = {w for w in all_words if len(w) > 3} or all_words
+    denominator = max(len(title_words), 1)
 
     best_candidate: dict[str, Any] | None = None
     best_score = 0.0
@@ -193,8 +224,8 @@ async def search_paper_by_title(
         candidate_title = (normalized.get("title") or "").lower()
         if not candidate_title:
             continue
-        overlap = sum(1 for w in title_words if w in candidate_title)
-        score = overlap / max(len(title_words), 1)
+        overlap = len(title_words.intersection(_WORD_RE.findall(candidate_title)))
+        score = overlap / denominator
         if score > best_score:
             best_score = score
             best_candidate = normalized
@@ -1,25 +1,56 @@
 from __future__ import annotations
 
 import base64
-import json
+from io import BytesIO
 from typing import Any
 from urllib.parse import urljoin
 
 import httpx
+import orjson
+from PIL import Image, ImageOps
+
+from ..cache import cached
+from ..utils.workers import run_cpu_bound
+
+_IMAGE_URL_PLACEHOLDER = "__image_data_url__"
+MAX_IMAGE_SIDE = 1536
+WEBP_QUALITY = 80
+
+
+def _downscale_image(image_bytes: bytes, content_type: str) -> tuple[bytes, str]:
+    # Vision models downsample large images anyway; shrinking and re-encoding
+    # as WebP first cuts the upload and prefill. Unreadable or animated images,
+    # and re-encodes that come out larger, pass through unchanged.
+    try:
+        with Image.open(BytesIO(image_bytes)) as img:
+            if getattr(img, "is_animated", False):
+                return image_bytes, content_type
+            # Re-encoding drops EXIF, so apply the orientation tag to the pixels first.
+            upright = ImageOps.exif_transpose(img)
+            upright.thumbnail((MAX_IMAGE_SIDE, MAX_IMAGE_SIDE))
+            has_alpha = upright.mode in ("RGBA", "LA", "PA") or "transparency" in upright.info
+            buf = BytesIO()
+            upright.convert("RGBA" if has_alpha else "RGB").save(buf, format="WEBP", quality=WEBP_QUALITY)
+    except Exception:
+        return image_bytes, content_type
+    if buf.tell() >= len(image_bytes):
+        return image_bytes, content_type
+    return buf.getvalue(), "image/webp"
 
 
 def _extract_json(text: str) -> dict[str, Any]:
     text = text.strip()
     try:
-        return json.loads(text)
-    except json.JSONDecodeError:
+        return orjson.loads(text)
+    except orjson.JSONDecodeError:
         start = text.find("{")
         end = text.rfind("}")
         if start >= 0 and end > start:
-            return json.loads(text[start : end + 1])
+            return orjson.loads(text[start : end + 1])
         raise
 
 
+@cached()
 async def analyze_context_image(
     image_bytes: bytes | None,
     content_type: str | None,
@@ -34,8 +65,9 @@ async def analyze_context_image(
         return {"available": False}
 
     safe_content_type = content_type or "image/png"
-    encoded = base64.b64encode(image_bytes).decode("ascii")
-    data_url = f"data:{safe_content_type};base64,{encoded}"
+    image_bytes, safe_content_type = await run_cpu_bound(
+        _downscale_image, image_bytes, safe_content_type
+    )
     endpoint = urljoin(base_url.rstrip("/") + "/", "chat/completions")
 
     prompt = (
@@ -60,7 +92,7 @@ async def analyze_context_image(
                 "role": "user",
                 "content": [
                     {"type": "text", "text": prompt},
-                    {"type": "image_url", "image_url": {"url": data_url}},
+                    {"type": "image_url", "image_url": {"url": _IMAGE_URL_PLACEHOLDER}},
                 ],
             }
         ],
@@ -68,8 +100,22 @@ async def analyze_context_image(
 
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
 
+    # Splice the base64 image straight into the serialized body so the encoded
+    # image is copied once rather than through str, f-string and JSON encoding.
+    body_head, body_tail = orjson.dumps(payload).split(_IMAGE_URL_PLACEHOLDER.encode(), 1)
+    body = b"".join(
+        (
+            body_head,
+            b"data:",
+            orjson.dumps(safe_content_type)[1:-1],
+            b";base64,",
+            base64.b64encode(image_bytes),
+            body_tail,
+        )
+    )
+
     async with httpx.AsyncClient(timeout=timeout_seconds) as client:
-        response = await client.post(endpoint, headers=headers, json=payload)
+        response = await client.post(endpoint, headers=headers, content=body)
         response.raise_for_status()
         data = response.json()
 
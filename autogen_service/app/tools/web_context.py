@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import re
 import time
+from functools import lru_cache
 from html import unescape
-from typing import Any
-from urllib.parse import parse_qs, unquote, urlparse
+from typing import Any, Iterable
+from urllib.parse import parse_qs, parse_qsl, unquote, urlencode, urlparse
 
 import httpx
 
+from ..cache import cached
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # optional; fall back to the regex stripper
+    LexborHTMLParser = None
+
 DEFAULT_ALLOWED_DOMAINS = [
     "edu",
     "ac.uk",
@@ -21,18 +30,72 @@ DEFAULT_ALLOWED_DOMAINS = [
 ]
 
 EMAIL_REGEX = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+_HREF_RE = re.compile(r'href="([^"]+)"', re.IGNORECASE)
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style).*?>.*?</\1>", re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_INTERESTS_RE = re.compile(
+    r"(research(?:\s+interests?| areas?)[:\-]\s*[^.]{20,220})", re.IGNORECASE
+)
+_NON_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "msclkid", "ref"})
+SEARCH_URL = "https://duckduckgo.com/html/"
+SEARCH_API_URL = "https://api.duckduckgo.com/"
+# Queries whose JSON answer yields fewer allowed links than this also scrape the HTML page.
+MIN_SEARCH_API_LINKS = 3
+PAGE_FETCH_CONCURRENCY = 8
+BROWSER_USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+_transport: httpx.AsyncHTTPTransport | None = None
+
+
+def _get_transport() -> httpx.AsyncHTTPTransport:
+    # Shared across runs so search and faculty-page connections stay warm.
+    global _transport
+    if _transport is None:
+        _transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=PAGE_FETCH_CONCURRENCY * 4,
+                max_keepalive_connections=PAGE_FETCH_CONCURRENCY * 2,
+            ),
+        )
+    return _transport
+
+
+def _new_client(timeout_seconds: int) -> httpx.AsyncClient:
+    # Each run gets its own client, and with it its own cookie jar, so cookies set
+    # by one professor's pages are never sent on another run. It is not closed
+    # because that would close the shared transport.
+    return httpx.AsyncClient(
+        transport=_get_transport(),
+        timeout=httpx.Timeout(timeout_seconds),
+        follow_redirects=True,
+        headers={"User-Agent": BROWSER_USER_AGENT},
+    )
+
+
+async def close_web_client() -> None:
+    global _transport
+    transport, _transport = _transport, None
+    if transport is not None:
+        await transport.aclose()
+
+
+@lru_cache(maxsize=8)
+def _parse_allowed_domains(raw: str) -> tuple[str, ...]:
+    domains = tuple(part.strip().lower() for part in raw.split(",") if part.strip())
+    return domains or tuple(DEFAULT_ALLOWED_DOMAINS)
 
 
 def parse_allowed_domains() -> list[str]:
-    raw = os.getenv("WEB_ALLOWED_DOMAINS", "").strip()
-    if not raw:
-        return DEFAULT_ALLOWED_DOMAINS.copy()
-    domains = [part.strip().lower() for part in raw.split(",") if part.strip()]
-    return domains or DEFAULT_ALLOWED_DOMAINS.copy()
+    # Parsing is memoized on the raw env value, so edits to it still take effect.
+    return list(_parse_allowed_domains(os.getenv("WEB_ALLOWED_DOMAINS", "")))
 
 
+@lru_cache(maxsize=256)
 def _guess_university_domain(university: str) -> str | None:
-    slug = re.sub(r"[^a-z0-9]+", "", university.lower())
+    slug = _NON_SLUG_RE.sub("", university.lower())
     if not slug:
         return None
     if "university" in slug:
@@ -57,58 +120,85 @@ def _extract_real_url(raw_url: str) -> str | None:
     return None
 
 
-def _is_allowed_url(url: str, allowed_domains: list[str]) -> bool:
+def _allowed_domain_pattern(allowed_domains: list[str]) -> re.Pattern[str]:
+    # One alternation matching a host that is, or is a subdomain of, an allowed domain.
+    alternatives = "|".join(
+        re.escape(domain.strip(".").lower()) for domain in allowed_domains if domain.strip(".")
+    )
+    return re.compile(rf"(?:^|\.)(?:{alternatives})$" if alternatives else r"(?!)")
+
+
+def _is_allowed_url(url: str, allowed_pattern: re.Pattern[str]) -> bool:
     try:
-        domain = (urlparse(url).netloc or "").lower()
-    except Exception:
-        return False
-    if not domain:
+        domain = urlparse(url).hostname or ""
+    except ValueError:
         return False
+    return bool(domain) and allowed_pattern.search(domain) is not None
+
+
+def _url_key(url: str) -> str:
+    # Links differing only in scheme, host case, trailing slash, fragment or
+    # tracking parameters point at the same page.
+    parsed = urlparse(url)
+    params = parse_qsl(parsed.query, keep_blank_values=True)
+    query = urlencode(
+        [(k, v) for k, v in params if not k.startswith("utm_") and k not in _TRACKING_PARAMS]
+    )
+    key = f"{parsed.netloc.lower()}{parsed.path.rstrip('/')}"
+    return f"{key}?{query}" if query else key
+
 
-    for allowed in allowed_domains:
-        allowed = allowed.lower()
-        if domain == allowed or domain.endswith(f".{allowed}") or domain.endswith(allowed):
-            return True
-    return False
+def _clean_links(raw_links: Iterable[str]) -> list[str]:
+    return list(
+        dict.fromkeys(real for link in raw_links if (real := _extract_real_url(link)))
+    )
+
+
+def _dict_entries(value: Any) -> list[dict[str, Any]]:
+    return [entry for entry in value if isinstance(entry, dict)] if isinstance(value, list) else []
+
+
+def _extract_links_from_search_json(data: dict[str, Any]) -> list[str]:
+    # Instant Answer results carry their URL in FirstURL; RelatedTopics may nest
+    # groups of topics under "Topics". Malformed entries are skipped, not fatal.
+    raw_links = [data.get("AbstractURL")]
+    for topic in [*_dict_entries(data.get("Results")), *_dict_entries(data.get("RelatedTopics"))]:
+        for entry in [topic, *_dict_entries(topic.get("Topics"))]:
+            raw_links.append(entry.get("FirstURL"))
+    return _clean_links(link for link in raw_links if isinstance(link, str))
 
 
 def _extract_links_from_search_html(html: str) -> list[str]:
-    links = re.findall(r'href="([^"]+)"', html, flags=re.IGNORECASE)
-    cleaned: list[str] = []
-    seen: set[str] = set()
-    for link in links:
-        real = _extract_real_url(unescape(link))
-        if not real:
-            continue
-        if real in seen:
-            continue
-        seen.add(real)
-        cleaned.append(real)
-    return cleaned
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(html)
+        hrefs = [node.attributes.get("href") or "" for node in tree.css("a[href]")]
+    else:
+        hrefs = [unescape(link) for link in _HREF_RE.findall(html)]
+    # Result links on the HTML page are protocol-relative redirects.
+    return _clean_links(f"https:{href}" if href.startswith("//") else href for href in hrefs)
 
 
 def _strip_html(raw_html: str) -> str:
-    without_scripts = re.sub(
-        r"<(script|style).*?>.*?</\1>", " ", raw_html, flags=re.IGNORECASE | re.DOTALL
-    )
-    without_tags = re.sub(r"<[^>]+>", " ", without_scripts)
+    if LexborHTMLParser is not None:
+        tree = LexborHTMLParser(raw_html)
+        tree.strip_tags(["script", "style"])
+        return _WS_RE.sub(" ", tree.text(separator=" ", strip=True)).strip()
+
+    without_scripts = _SCRIPT_STYLE_RE.sub(" ", raw_html)
+    without_tags = _TAG_RE.sub(" ", without_scripts)
     text = unescape(without_tags)
-    text = re.sub(r"\s+", " ", text).strip()
+    text = _WS_RE.sub(" ", text).strip()
     return text
 
 
 def _extract_research_interests(text: str) -> list[str]:
     if not text:
         return []
-    candidates = re.findall(
-        r"(research(?:\s+interests?| areas?)[:\-]\s*[^.]{20,220})",
-        text,
-        flags=re.IGNORECASE,
-    )
+    candidates = _INTERESTS_RE.findall(text)
     cleaned: list[str] = []
     seen: set[str] = set()
     for item in candidates:
-        value = re.sub(r"\s+", " ", item).strip(" -:")
+        value = _WS_RE.sub(" ", item).strip(" -:")
         lower = value.lower()
         if lower in seen:
             continue
@@ -117,6 +207,36 @@ def _extract_research_interests(text: str) -> list[str]:
     return cleaned[:8]
 
 
+async def _get_many(
+    client: httpx.AsyncClient,
+    requests: list[tuple[str, dict[str, str] | None]],
+    deadline: float,
+) -> list[httpx.Response | None]:
+    # Run the GETs concurrently; a request that fails or is still running at the
+    # deadline comes back as None.
+    semaphore = asyncio.Semaphore(PAGE_FETCH_CONCURRENCY)
+
+    async def fetch(url: str, params: dict[str, str] | None) -> httpx.Response:
+        async with semaphore:
+            return await client.get(url, params=params)
+
+    tasks = [asyncio.create_task(fetch(url, params)) for url, params in requests]
+    if not tasks:
+        return []
+    try:
+        await asyncio.wait(tasks, timeout=max(deadline - time.monotonic(), 0))
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    return [
+        task.result() if not task.cancelled() and task.exception() is None else None
+        for task in tasks
+    ]
+
+
+# Only cache runs that found something; an empty result is usually a transient failure.
+@cached(keep=lambda result: bool(result.get("sources")))
 async def gather_professor_web_context(
     professor_name: str,
     university: str,
@@ -145,52 +265,59 @@ async def gather_professor_web_context(
     snippets: list[str] = []
     emails: list[str] = []
     interests: list[str] = []
-    seen_urls: set[str] = set()
-    steps_used = 0
     deadline = time.monotonic() + max(timeout_seconds, 5)
 
-    async with httpx.AsyncClient(
-        timeout=httpx.Timeout(timeout_seconds),
-        follow_redirects=True,
-        headers={
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
-        },
-    ) as client:
-        for query in queries:
-            if steps_used >= max_steps or time.monotonic() >= deadline:
-                break
-
-            search_url = "https://duckduckgo.com/html/"
-            response = await client.get(search_url, params={"q": query})
-            if response.status_code != 200:
-                continue
-
-            links = _extract_links_from_search_html(response.text)
-            for link in links:
-                if steps_used >= max_steps or time.monotonic() >= deadline:
-                    break
-                if link in seen_urls:
-                    continue
-                seen_urls.add(link)
-                if not _is_allowed_url(link, allowed_domains):
-                    continue
-
-                steps_used += 1
-                try:
-                    page_response = await client.get(link)
-                except Exception:
-                    continue
-                if page_response.status_code != 200:
-                    continue
-
-                text = _strip_html(page_response.text)[:8000]
-                if not text:
-                    continue
-
-                sources.append(link)
-                snippets.append(text[:700])
-                emails.extend(EMAIL_REGEX.findall(text))
-                interests.extend(_extract_research_interests(text))
+    client = _new_client(timeout_seconds)
+    allowed_pattern = _allowed_domain_pattern(allowed_domains)
+    api_params = {"format": "json", "no_html": "1", "skip_disambig": "1"}
+    api_responses = await _get_many(
+        client,
+        [(SEARCH_API_URL, {"q": query, **api_params}) for query in queries],
+        deadline,
+    )
+    query_links: list[list[str]] = []
+    for response in api_responses:
+        data: Any = {}
+        if response is not None and response.status_code == 200:
+            try:
+                data = response.json()
+            except ValueError:
+                pass
+        links = _extract_links_from_search_json(data) if isinstance(data, dict) else []
+        query_links.append([link for link in links if _is_allowed_url(link, allowed_pattern)])
+
+    fallback = [i for i, links in enumerate(query_links) if len(links) < MIN_SEARCH_API_LINKS]
+    html_responses = await _get_many(
+        client, [(SEARCH_URL, {"q": queries[i]}) for i in fallback], deadline
+    )
+    for i, response in zip(fallback, html_responses):
+        if response is None or response.status_code != 200:
+            continue
+        query_links[i].extend(
+            link
+            for link in _extract_links_from_search_html(response.text)
+            if _is_allowed_url(link, allowed_pattern)
+        )
+
+    unique_links: dict[str, str] = {}
+    for link in (link for links in query_links for link in links):
+        unique_links.setdefault(_url_key(link), link)
+    links = list(unique_links.values())[:max_steps]
+    steps_used = len(links)
+
+    page_responses = await _get_many(client, [(link, None) for link in links], deadline)
+    for link, page_response in zip(links, page_responses):
+        if page_response is None or page_response.status_code != 200:
+            continue
+
+        text = _strip_html(page_response.text)[:8000]
+        if not text:
+            continue
+
+        sources.append(link)
+        snippets.append(text[:700])
+        emails.extend(EMAIL_REGEX.findall(text))
+        interests.extend(_extract_research_interests(text))
 
     unique_sources = list(dict.fromkeys(sources))
     unique_interests = list(dict.fromkeys(interests))
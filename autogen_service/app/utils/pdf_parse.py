@@ -1,22 +1,37 @@
 from __future__ import annotations
 
 from io import BytesIO
+from typing import IO
 
 from pypdf import PdfReader
 
 
-def extract_text_from_pdf_bytes(pdf_bytes: bytes) -> str:
-    if not pdf_bytes:
-        return ""
+DEFAULT_MAX_CHARS = 40_000
 
-    reader = PdfReader(BytesIO(pdf_bytes))
+
+def extract_text_from_pdf_file(pdf_file: IO[bytes], max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    # Stop parsing once max_chars of text are collected; callers only use a prefix.
+    reader = PdfReader(pdf_file)
     pages: list[str] = []
+    total = 0
     for page in reader.pages:
         try:
             text = page.extract_text() or ""
         except Exception:
             text = ""
-        if text.strip():
-            pages.append(text)
+        if not text.strip():
+            continue
+        if not pages:
+            text = text.lstrip()
+        pages.append(text)
+        total += len(text) + 2
+        if total >= max_chars:
+            break
+
+    return "\n\n".join(pages).strip()[:max_chars]
 
-    return "\n\n".join(pages).strip()
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, max_chars: int = DEFAULT_MAX_CHARS) -> str:
+    if not pdf_bytes:
+        return ""
+    return extract_text_from_pdf_file(BytesIO(pdf_bytes), max_chars)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import asyncio
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+PIPELINE_WORKER_THREADS = int(os.getenv("PIPELINE_WORKER_THREADS", "4"))
+
+T = TypeVar("T")
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # CPU-bound work gets its own bounded pool. The loop's default executor also
+    # resolves DNS for every outbound request and must not queue behind it.
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=PIPELINE_WORKER_THREADS, thread_name_prefix="pipeline-cpu"
+        )
+    return _executor
+
+
+async def run_cpu_bound(func: Callable[..., T], *args: Any) -> T:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+
+
+def shutdown_cpu_executor() -> None:
+    global _executor
+    executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)